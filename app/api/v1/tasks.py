@@ -6,26 +6,60 @@ by manipulating URL parameters.
 """
 
 import uuid
+from datetime import datetime, timezone
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from pydantic import BaseModel, Field, StringConstraints, field_validator
 from sqlmodel import Session
 
 from app.auth.dependencies import CurrentUserId
-from app.core.database import get_session
+from app.core.config import settings
+from app.core.database import engine, get_session
+from app.core.singleflight import read_coalescer, request_key
+from app.models.task import TAG_MAX_LENGTH
+from app.services.reminder_scheduler import get_reminder_scheduler
 from app.services.task_service import TaskService
+from app.services.write_pipeline import get_write_pipeline
 
 
 # Request/Response models
 
+Tag = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, min_length=1, max_length=TAG_MAX_LENGTH),
+]
+
+# Maximum number of tags on a task, and in a tag filter
+MAX_TAGS = 20
+
+def _to_naive_utc(value: datetime | None) -> datetime | None:
+    """Store timestamps as naive UTC, like created_at/updated_at."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class TaskCreate(BaseModel):
     """Request model for creating a task."""
 
     title: str = Field(min_length=1, max_length=255, description="Task description")
+    due_at: datetime | None = Field(default=None, description="When the task is due")
+    remind_at: datetime | None = Field(
+        default=None,
+        description="When to send a reminder"
+    )
+    tags: list[Tag] = Field(default_factory=list, max_length=MAX_TAGS, description="Task labels")
+
+    _normalize_times = field_validator("due_at", "remind_at")(_to_naive_utc)
 
 
 class TaskUpdate(BaseModel):
-    """Request model for updating a task (partial update)."""
+    """Request model for updating a task (partial update).
+
+    Fields that are omitted are left unchanged; due_at/remind_at/tags sent
+    as null are cleared.
+    """
 
     title: str | None = Field(
         default=None,
@@ -33,6 +67,50 @@ class TaskUpdate(BaseModel):
         max_length=255,
         description="Updated task description"
     )
+    due_at: datetime | None = Field(default=None, description="Updated due date")
+    remind_at: datetime | None = Field(
+        default=None,
+        description="Updated reminder time"
+    )
+    tags: list[Tag] | None = Field(
+        default=None,
+        max_length=MAX_TAGS,
+        description="Replacement set of task labels"
+    )
+
+    _normalize_times = field_validator("due_at", "remind_at")(_to_naive_utc)
+
+
+class TaskReorder(BaseModel):
+    """Request model for moving a task in the user's manual order."""
+
+    after_id: uuid.UUID | None = Field(
+        default=None,
+        description="Task that should directly precede the moved task (omit for top)"
+    )
+    before_id: uuid.UUID | None = Field(
+        default=None,
+        description="Task that should directly follow the moved task (omit for bottom)"
+    )
+
+
+def _rebalance_positions(user_id: str) -> None:
+    """Background job: re-key a user's list once position keys grow long."""
+    with Session(engine) as session:
+        TaskService(session, user_id).rebalance_positions()
+
+
+def _check_position_length(task, user_id: str, background_tasks: BackgroundTasks) -> None:
+    """Schedule a background rebalance once a task's position key grows too long."""
+    if task.position is not None and len(task.position) > settings.task_position_max_length:
+        background_tasks.add_task(_rebalance_positions, user_id)
+
+
+def _notify_reminders(task) -> None:
+    """Let this process's reminder scheduler pick up a new reminder at once."""
+    reminders = get_reminder_scheduler()
+    if reminders is not None:
+        reminders.notify(task)
 
 
 # Router - NO user_id in path, user comes from token
@@ -44,23 +122,37 @@ router = APIRouter(
 
 @router.get("")
 def list_tasks(
+    request: Request,
     current_user: CurrentUserId,
+    tag: list[Tag] | None = Query(
+        default=None,
+        max_length=MAX_TAGS,
+        description="Only return tasks carrying all of these tags"
+    ),
     session: Session = Depends(get_session),
 ):
     """List all tasks for the authenticated user.
 
     User ID is extracted from the JWT token, not from URL.
-    Returns a list of all tasks owned by the user.
+    Returns a list of all tasks owned by the user, optionally filtered to
+    those carrying every given tag (e.g. ?tag=work&tag=urgent).
+    Identical concurrent requests from the same user share one query.
     """
     service = TaskService(session, current_user)
-    tasks = service.list_tasks()
-    return {"tasks": tasks}
+    if settings.read_coalescing_enabled:
+        tasks = read_coalescer.do(
+            request_key(request, current_user), lambda: service.list_tasks(tag)
+        )
+    else:
+        tasks = service.list_tasks(tag)
+    return {"tasks": list(tasks)}
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 def create_task(
     task_data: TaskCreate,
     current_user: CurrentUserId,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
 ):
     """Create a new task for the authenticated user.
@@ -68,8 +160,52 @@ def create_task(
     The task is automatically associated with the authenticated user's ID
     from the JWT token.
     """
+    service = TaskService(session, current_user, pipeline=get_write_pipeline())
+    task = service.create_task(
+        task_data.title,
+        due_at=task_data.due_at,
+        remind_at=task_data.remind_at,
+        tags=task_data.tags,
+    )
+    _check_position_length(task, current_user, background_tasks)
+    _notify_reminders(task)
+    return task
+
+
+@router.get("/archived")
+def list_archived_tasks(
+    current_user: CurrentUserId,
+    session: Session = Depends(get_session),
+):
+    """List the authenticated user's archived (completed, swept) tasks.
+
+    Archived tasks are kept out of the main task list; most recently
+    archived first.
+    """
     service = TaskService(session, current_user)
-    task = service.create_task(task_data.title)
+    tasks = service.list_archived_tasks()
+    return {"tasks": tasks}
+
+
+@router.post("/archived/{task_id}/restore")
+def restore_task(
+    task_id: uuid.UUID,
+    current_user: CurrentUserId,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+):
+    """Restore an archived task to the end of the user's task list.
+
+    Returns 404 if the archived task doesn't exist or doesn't belong to the user.
+    """
+    service = TaskService(session, current_user)
+    task = service.restore_task(task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    _check_position_length(task, current_user, background_tasks)
     return task
 
 
@@ -100,24 +236,28 @@ def update_task(
     current_user: CurrentUserId,
     session: Session = Depends(get_session),
 ):
-    """Update a task's title.
+    """Update a task's title, due date or reminder.
 
     Supports partial updates - only provided fields are updated.
     Returns 404 if the task doesn't exist or doesn't belong to the user.
     """
-    if task_data.title is None:
+    changes = task_data.model_dump(exclude_unset=True)
+    title = changes.pop("title", None)
+    if title is None and not changes:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No update data provided"
         )
 
     service = TaskService(session, current_user)
-    task = service.update_task(task_id, task_data.title)
+    task = service.update_task(task_id, title, **changes)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+    if "remind_at" in changes:
+        _notify_reminders(task)
     return task
 
 
@@ -152,7 +292,7 @@ def toggle_complete(
     If the task is complete, it becomes incomplete.
     Returns 404 if the task doesn't exist or doesn't belong to the user.
     """
-    service = TaskService(session, current_user)
+    service = TaskService(session, current_user, pipeline=get_write_pipeline())
     task = service.toggle_complete(task_id)
     if not task:
         raise HTTPException(
@@ -160,3 +300,42 @@ def toggle_complete(
             detail="Task not found"
         )
     return task
+
+
+@router.patch("/{task_id}/reorder")
+def reorder_task(
+    task_id: uuid.UUID,
+    reorder: TaskReorder,
+    current_user: CurrentUserId,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+):
+    """Move a task between two neighbouring tasks.
+
+    Only the moved task is updated. If its new position key grows too long,
+    the user's list is rebalanced in the background after the response.
+    Returns 404 if any referenced task doesn't exist or doesn't belong to
+    the user, and 409 if the neighbours are not in the given order.
+    """
+    if reorder.after_id is None and reorder.before_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No reorder target provided"
+        )
+
+    service = TaskService(session, current_user)
+    try:
+        task = service.move_task(task_id, reorder.after_id, reorder.before_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Reorder neighbours are not adjacent in the given order"
+        )
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    _check_position_length(task, current_user, background_tasks)
+    return task
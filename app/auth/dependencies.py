@@ -367,6 +367,12 @@ async def get_current_user_id(
             detail="Invalid token payload",
         )
 
+    # Exposed to middleware (access log) after the request completes
+    request.state.user_id = user_id
+    # Targeted profiling may only start once the user is verified
+    profile = getattr(request.state, "profile", None)
+    if profile is not None:
+        profile.start_for_user(user_id)
     return user_id
 
 
@@ -0,0 +1,158 @@
+"""Structured (JSON) access logging with sampling.
+
+Each request produces at most one JSON line with the route template, status,
+a hash of the user id, total latency and time spent in database calls.
+
+Logging stays off the request path: records are handed to a QueueHandler and
+formatted and written by a QueueListener thread, so request threads never
+wait on I/O. Successful responses are sampled at ACCESS_LOG_SAMPLE_RATE;
+errors (status >= 400) and requests slower than ACCESS_LOG_SLOW_MS are
+always logged.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.access")
+
+# Per-request DB time accumulator. The list is created by the middleware and
+# shared with the threadpool worker through the copied context.
+_db_time: ContextVar[list[float] | None] = ContextVar("access_log_db_time", default=None)
+
+_listener: QueueListener | None = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that defers all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _JsonFormatter(logging.Formatter):
+    """Render the record's dict payload as a single JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, separators=(",", ":"), default=str)
+
+
+def configure_access_log(stream=sys.stdout) -> None:
+    """Attach the queue handler and start the writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(_JsonFormatter())
+
+    logger.handlers = [_DeferredQueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+
+
+def shutdown_access_log() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Accumulate cursor execution time into the current request's DB time."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("access_log_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["access_log_start"].pop()
+        accumulator = _db_time.get()
+        if accumulator is not None:
+            accumulator[0] += time.perf_counter() - start
+
+
+def hash_user_id(user_id: str | None) -> str | None:
+    """Return a short, stable, non-reversible identifier for a user."""
+    if not user_id:
+        return None
+    return hashlib.sha256(user_id.encode()).hexdigest()[:16]
+
+
+def route_template(scope) -> str:
+    """Return the full path template of the matched route.
+
+    Routes of an included router may report their path relative to the
+    router (e.g. "/tasks/{task_id}" under "/api/v1"), depending on the
+    FastAPI version. The missing prefix is recovered from the request path,
+    which has as many segments after it as the template. Unmatched
+    requests are reported by their raw path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return scope["path"]
+    depth = template.rstrip("/").count("/")
+    segments = scope["path"].rstrip("/").split("/")
+    return "/".join(segments[: len(segments) - depth]) + template
+
+
+class AccessLogMiddleware:
+    """ASGI middleware emitting one sampled JSON access record per request."""
+
+    def __init__(self, app, sample_rate: float = 1.0, slow_ms: float = 500.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        accumulator = [0.0]
+        token = _db_time.set(accumulator)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            _db_time.reset(token)
+            if (
+                status_code >= 400
+                or latency_ms >= self.slow_ms
+                or random.random() < self.sample_rate
+            ):
+                logger.info({
+                    "ts": time.time(),
+                    "method": scope["method"],
+                    "route": route_template(scope),
+                    "status": status_code,
+                    "user": hash_user_id(scope.get("state", {}).get("user_id")),
+                    "latency_ms": round(latency_ms, 2),
+                    "db_ms": round(accumulator[0] * 1000, 2),
+                    "sampled": status_code < 400 and latency_ms < self.slow_ms,
+                })
+
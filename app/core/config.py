@@ -35,6 +35,54 @@ class Settings(BaseSettings):
     better_auth_base_url: str
     database_url: str = ""
 
+    # Group-commit write pipeline (opt-in). Concurrent create/toggle calls
+    # arriving within the window are committed in a single transaction.
+    write_pipeline_enabled: bool = False
+    write_pipeline_window_ms: float = 2.0
+    write_pipeline_max_batch: int = 128
+
+    # Number of Postgres hash partitions for the task table (0 = unpartitioned)
+    task_partition_count: int = 0
+
+    # Position keys longer than this trigger a background rebalance
+    task_position_max_length: int = 32
+
+    # Share one DB query between identical concurrent read requests (opt-in).
+    # Reads after a user's own write are only guaranteed fresh when a single
+    # worker process serves that user: write generations are per process.
+    read_coalescing_enabled: bool = False
+
+    # In-process reminder scheduler
+    reminders_enabled: bool = False
+    reminder_window_seconds: float = 300
+    reminder_refresh_seconds: float = 30
+    reminder_batch_size: int = 1000
+    # Callable ("package.module:function") that delivers a reminder, called
+    # with the Task. Empty = write reminders to stdout via the
+    # "app.reminders" logger. Delivery is at-most-once: the reminder is
+    # claimed before the callable runs and is not retried if it fails.
+    reminder_delivery: str = ""
+
+    # On-demand request profiling (middleware is not installed when off)
+    profiling_enabled: bool = False
+    profiling_token: str = ""
+    profiling_sample_rate: float = 0.0
+    profiling_user_ids: str = ""
+    profiling_dir: str = "profiles"
+    profiling_interval_ms: float = 1.0
+
+    # Background archival of completed tasks into task_archive
+    task_archive_enabled: bool = False
+    task_archive_after_days: float = 30
+    task_archive_batch_size: int = 500
+    task_archive_interval_seconds: float = 300
+
+    # Structured access log. 2xx/3xx responses are sampled; errors and slow
+    # requests are always logged.
+    access_log_enabled: bool = True
+    access_log_sample_rate: float = 1.0
+    access_log_slow_ms: float = 500.0
+
     class Config:
         extra = "ignore"
 
@@ -26,6 +26,21 @@ def get_session():
 def create_db_and_tables():
     """Create all database tables defined in SQLModel metadata.
 
+    When TASK_PARTITION_COUNT is set on Postgres, the task table is created
+    with partition-aware DDL instead of the plain model definition.
+
     Should be called on application startup.
     """
+    from app.core.partitioning import TASK_TABLE, create_partitioned_task_table
+
+    if settings.task_partition_count > 0 and engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            create_partitioned_task_table(conn, settings.task_partition_count)
+            tables = [
+                table for table in SQLModel.metadata.sorted_tables
+                if table.name != TASK_TABLE
+            ]
+            SQLModel.metadata.create_all(conn, tables=tables)
+        return
+
     SQLModel.metadata.create_all(engine)
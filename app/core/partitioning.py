@@ -0,0 +1,203 @@
+"""Postgres declarative hash partitioning of the task table by user_id.
+
+Every TaskService query filters on user_id, so with `PARTITION BY HASH
+(user_id)` the planner prunes each query to a single partition. Vacuum,
+index bloat and index depth then scale with the partition size instead of
+the whole table.
+
+Postgres requires the partition key to be part of every unique constraint,
+so the partitioned table's primary key is (user_id, id). The ORM mapping of
+Task uses the same composite identity so UPDATE/DELETE statements emitted
+on flush also carry user_id and prune.
+
+Partitioning is enabled by setting TASK_PARTITION_COUNT to a positive number
+of partitions. It has no effect on non-Postgres databases.
+"""
+
+import json
+from collections.abc import Mapping
+
+from sqlalchemy import MetaData, PrimaryKeyConstraint, Table, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.models.task import Task
+
+TASK_TABLE = "task"
+
+
+def partition_name(remainder: int) -> str:
+    """Return the table name of the partition holding `remainder`."""
+    return f"{TASK_TABLE}_p{remainder}"
+
+
+def partitioned_task_table(metadata: MetaData | None = None) -> Table:
+    """Build a partition-aware copy of the Task table definition.
+
+    The copy keeps every column and index of the model but declares
+    `PRIMARY KEY (user_id, id)` and `PARTITION BY HASH (user_id)`.
+    """
+    table = Task.__table__.to_metadata(metadata or MetaData())
+    for column in table.primary_key.columns:
+        column.primary_key = False
+    table.append_constraint(
+        PrimaryKeyConstraint(table.c.user_id, table.c.id, name=f"{TASK_TABLE}_pkey")
+    )
+    table.dialect_options["postgresql"]["partition_by"] = "HASH (user_id)"
+    return table
+
+
+def partition_ddl(partitions: int) -> list[str]:
+    """Return the DDL statements creating the partitioned task table.
+
+    Args:
+        partitions: Number of hash partitions (MODULUS)
+
+    Returns:
+        Statements for the parent table, its partitions and its indexes.
+        Indexes declared on the parent cascade to every partition.
+    """
+    from sqlalchemy.dialects import postgresql
+
+    if partitions < 1:
+        raise ValueError("partitions must be a positive integer")
+
+    dialect = postgresql.dialect()
+    table = partitioned_task_table()
+    statements = [str(CreateTable(table).compile(dialect=dialect)).strip()]
+    statements += [
+        f"CREATE TABLE {partition_name(i)} PARTITION OF {TASK_TABLE} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+        for i in range(partitions)
+    ]
+    statements += [
+        str(CreateIndex(index).compile(dialect=dialect)).strip()
+        for index in sorted(table.indexes, key=lambda index: index.name)
+    ]
+    return statements
+
+
+def is_task_table_partitioned(conn: Connection) -> bool:
+    """Return True if the task table exists and is hash partitioned."""
+    return bool(
+        conn.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :name AND c.relnamespace = "
+                "to_regnamespace(current_schema())::oid"
+            ),
+            {"name": TASK_TABLE},
+        ).first()
+    )
+
+
+def create_partitioned_task_table(conn: Connection, partitions: int) -> None:
+    """Create the partitioned task table if no task table exists yet."""
+    exists = conn.execute(
+        text("SELECT to_regclass(:name)"), {"name": TASK_TABLE}
+    ).scalar()
+    if exists is not None:
+        return
+    for statement in partition_ddl(partitions):
+        conn.exec_driver_sql(statement)
+
+
+def migrate_task_table(conn: Connection, partitions: int, keep_old: bool = False) -> int:
+    """Convert an existing plain task table into a hash-partitioned one.
+
+    Runs inside the caller's transaction: the old table and its indexes are
+    renamed out of the way, the partitioned table is created, rows are
+    copied with a single INSERT ... SELECT, and the old table is dropped
+    unless `keep_old` is set.
+
+    Args:
+        conn: Connection with an open transaction
+        partitions: Number of hash partitions to create
+        keep_old: Keep the original rows in `task_unpartitioned`
+
+    Returns:
+        Number of rows copied
+    """
+    if is_task_table_partitioned(conn):
+        raise RuntimeError("task table is already partitioned")
+
+    old = f"{TASK_TABLE}_unpartitioned"
+    conn.exec_driver_sql(f"LOCK TABLE {TASK_TABLE} IN ACCESS EXCLUSIVE MODE")
+    conn.exec_driver_sql(f"ALTER TABLE {TASK_TABLE} RENAME TO {old}")
+
+    # Free up index and constraint names for the new table
+    index_names = conn.execute(
+        text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = :table AND schemaname = current_schema()"
+        ),
+        {"table": old},
+    ).scalars().all()
+    for name in index_names:
+        conn.exec_driver_sql(f'ALTER INDEX "{name}" RENAME TO "{name}_unpartitioned"')
+
+    for statement in partition_ddl(partitions):
+        conn.exec_driver_sql(statement)
+
+    columns = ", ".join(column.name for column in Task.__table__.columns)
+    copied = conn.exec_driver_sql(
+        f"INSERT INTO {TASK_TABLE} ({columns}) SELECT {columns} FROM {old}"
+    ).rowcount
+
+    if not keep_old:
+        conn.exec_driver_sql(f"DROP TABLE {old}")
+    conn.exec_driver_sql(f"ANALYZE {TASK_TABLE}")
+    return copied
+
+
+def scanned_relations(conn: Connection, statement: str, parameters) -> set[str]:
+    """Return the relations a statement's plan reads from.
+
+    Runs `EXPLAIN (FORMAT JSON)` on the statement; with bound parameters
+    inlined by the driver, partition pruning happens at plan time, so the
+    plan only names the partitions that survive pruning.
+
+    `parameters` may also be the list of parameter sets of an executemany
+    statement (e.g. a flush updating several rows); each set is explained
+    on its own and the relations are combined.
+    """
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(
+        parameters[0], (Mapping, list, tuple)
+    ):
+        combined: set[str] = set()
+        for parameter_set in parameters:
+            combined |= scanned_relations(conn, statement, parameter_set)
+        return combined
+
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    relations: set[str] = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return relations
+
+
+class StatementRecorder:
+    """Collects task statements executed on an engine, for plan inspection."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: list[tuple[str, object]] = []
+
+    def __enter__(self) -> "StatementRecorder":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if TASK_TABLE in statement and not statement.lstrip().upper().startswith("EXPLAIN"):
+            self.statements.append((statement, parameters))
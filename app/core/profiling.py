@@ -0,0 +1,198 @@
+"""On-demand statistical profiling of individual requests.
+
+Opt-in with PROFILING_ENABLED; when it is off the middleware is not
+installed, so there is no per-request overhead at all.
+
+A request is profiled when any of the following holds:
+- it carries an `X-Profile-Token` header equal to PROFILING_TOKEN
+- it is picked by PROFILING_SAMPLE_RATE
+- its authenticated user is listed in PROFILING_USER_IDS. The middleware
+  cannot trust the bearer token, so it only attaches an idle profile to the
+  request state; `get_current_user_id` starts it once the token is verified,
+  and the profile covers the request from that point on.
+
+While a profiled request runs, a sampler thread records the Python stacks of
+the threads that can run it: the event loop thread (async dependencies such
+as auth) and the threadpool workers (TaskService calls, serialization). Only
+stacks executing app, FastAPI, Starlette or Pydantic code are kept, so idle
+workers are skipped, and background threads (archive sweeper, write
+pipeline, reminder scheduler) are never sampled. Stacks of concurrent
+requests can show up in the same profile, so profile on a quiet instance
+when possible.
+
+Profiles are written to PROFILING_DIR in folded-stack format
+(`frame;frame;frame count` per line), readable by flamegraph.pl, speedscope
+and inferno. The file name is returned in the `X-Profile-Id` header of
+profiled responses only.
+"""
+
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import anyio
+import fastapi
+import pydantic
+import starlette
+
+import app
+
+# Name anyio gives the threadpool workers running sync endpoints/dependencies
+_WORKER_THREAD_NAME = "AnyIO worker thread"
+
+# Only stacks touching these packages belong to request handling
+_PACKAGE_DIRS = tuple(
+    os.path.dirname(module.__file__) + os.sep
+    for module in (app, fastapi, starlette, pydantic)
+)
+
+
+class StackSampler:
+    """Samples the stacks of request-handling threads at a fixed interval.
+
+    Args:
+        interval: Seconds between samples
+        loop_thread: Ident of the event loop thread serving the request;
+            sampled in addition to the threadpool workers
+    """
+
+    def __init__(self, interval: float, loop_thread: int | None = None):
+        self.interval = interval
+        self.loop_thread = loop_thread
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            threads = {
+                thread.ident
+                for thread in threading.enumerate()
+                if thread.name == _WORKER_THREAD_NAME
+            }
+            threads.add(self.loop_thread)
+            for ident, frame in sys._current_frames().items():
+                if ident not in threads:
+                    continue
+                stack = []
+                relevant = False
+                while frame is not None:
+                    code = frame.f_code
+                    relevant = relevant or code.co_filename.startswith(_PACKAGE_DIRS)
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                    )
+                    frame = frame.f_back
+                if relevant:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Return the samples in folded-stack format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+class RequestProfile:
+    """The profile of one request, started once the request qualifies.
+
+    Attached to the request state as `profile` for user-targeted profiling.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        user_ids: frozenset[str] = frozenset(),
+        loop_thread: int | None = None,
+    ):
+        self.sampler = StackSampler(interval, loop_thread)
+        self.user_ids = user_ids
+        self.started = False
+
+    def start(self) -> None:
+        if not self.started:
+            self.started = True
+            self.sampler.start()
+
+    def start_for_user(self, user_id: str) -> None:
+        """Start profiling if the verified user is targeted."""
+        if user_id in self.user_ids:
+            self.start()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware capturing a statistical profile of selected requests."""
+
+    def __init__(
+        self,
+        app,
+        output_dir: str,
+        token: str = "",
+        sample_rate: float = 0.0,
+        user_ids: str = "",
+        interval_ms: float = 1.0,
+    ):
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.user_ids = frozenset(u.strip() for u in user_ids.split(",") if u.strip())
+        self.interval = interval_ms / 1000.0
+
+    def _should_profile(self, headers: dict[bytes, bytes]) -> bool:
+        supplied = headers.get(b"x-profile-token")
+        if self.token and supplied and hmac.compare_digest(supplied, self.token):
+            return True
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        forced = self._should_profile(dict(scope["headers"]))
+        if not forced and not self.user_ids:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(self.interval, self.user_ids, threading.get_ident())
+        if forced:
+            profile.start()
+        else:
+            # Started by get_current_user_id if the verified user is targeted
+            scope.setdefault("state", {})["profile"] = profile
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.folded"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and profile.started:
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profile.started:
+                await anyio.to_thread.run_sync(profile.sampler.stop)
+                await anyio.to_thread.run_sync(
+                    self._write, profile_id, profile.sampler.folded()
+                )
+
+    def _write(self, profile_id: str, folded: str) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / profile_id).write_text(folded)
@@ -0,0 +1,141 @@
+"""Single-flight coalescing of identical concurrent reads.
+
+When identical requests (same user, route and query parameters) are in
+flight at the same time, only the first one runs the query; the others wait
+for and share its result. Nothing is cached: once the leading call finishes,
+the next request runs a fresh query.
+
+A flight that started before a user's write could still return data from
+before it, so every committed TaskService write bumps that user's write
+generation, which is part of the request key: a read issued after a write
+never joins a flight that started before it. Generations live in this
+process only, so with several workers a read may join an older flight in a
+worker that did not see the write; READ_COALESCING_ENABLED is therefore off
+by default.
+
+Each in-flight call is a `concurrent.futures.Future`, so waiters on the sync
+threadpool path block on it directly while async handlers await it through
+`asyncio.wrap_future`. Both kinds of caller can share the same call.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from fastapi import Request
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key.
+
+    Attributes:
+        coalesced: Number of calls that were served by another call's result
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn`, or wait for the identical call already in flight.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument function producing the result
+
+        Returns:
+            The result of the call that ran
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._finish(key, future, exc=exc)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of `do` for coroutine handlers."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn()
+        except BaseException as exc:
+            self._finish(key, future, exc=exc)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        """Return the in-flight future for `key` and whether we lead it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(
+        self,
+        key: Hashable,
+        future: Future,
+        result: Any = None,
+        exc: BaseException | None = None,
+    ) -> None:
+        # Unregister first so requests arriving from now on run a fresh query
+        with self._lock:
+            del self._calls[key]
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+
+class WriteGenerations:
+    """Per-user counters of committed writes.
+
+    Users are hashed into a fixed number of slots so memory stays bounded;
+    two users sharing a slot only costs an occasional uncoalesced query.
+    """
+
+    def __init__(self, slots: int = 4096):
+        self._lock = threading.Lock()
+        self._counts = [0] * slots
+
+    def bump(self, user_id: str) -> None:
+        """Record a committed write by `user_id`."""
+        with self._lock:
+            self._counts[hash(user_id) % len(self._counts)] += 1
+
+    def get(self, user_id: str) -> int:
+        """Return the current write generation of `user_id`."""
+        return self._counts[hash(user_id) % len(self._counts)]
+
+
+def request_key(request: Request, user_id: str) -> tuple:
+    """Coalescing key: (user, write generation, route, sorted query params)."""
+    return (
+        user_id,
+        write_generations.get(user_id),
+        request.method,
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+    )
+
+
+# Shared coalescer for read endpoints
+read_coalescer = SingleFlight()
+
+# Bumped by TaskService after every committed write
+write_generations = WriteGenerations()
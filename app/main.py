@@ -1,8 +1,48 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import tasks
+from app.core.access_log import (
+    AccessLogMiddleware,
+    configure_access_log,
+    instrument_engine,
+    shutdown_access_log,
+)
+from app.core.config import settings
+from app.core.database import engine
+from app.core.singleflight import read_coalescer
+from app.services.archive_service import ArchiveSweeper
+from app.services.reminder_scheduler import get_reminder_scheduler
+from app.services.write_pipeline import shutdown_write_pipeline
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.access_log_enabled:
+        configure_access_log()
+    sweeper = None
+    if settings.task_archive_enabled:
+        sweeper = ArchiveSweeper(
+            after_days=settings.task_archive_after_days,
+            batch_size=settings.task_archive_batch_size,
+            interval_seconds=settings.task_archive_interval_seconds,
+        )
+        sweeper.start()
+    reminders = get_reminder_scheduler()
+    if reminders is not None:
+        reminders.start()
+    yield
+    if reminders is not None:
+        reminders.stop()
+    if sweeper is not None:
+        sweeper.stop()
+    # Flush any writes still waiting in the group-commit pipeline
+    shutdown_write_pipeline()
+    shutdown_access_log()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,8 +52,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.access_log_enabled:
+    instrument_engine(engine)
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=settings.access_log_sample_rate,
+        slow_ms=settings.access_log_slow_ms,
+    )
+
+if settings.profiling_enabled:
+    from app.core.profiling import ProfilingMiddleware
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.profiling_dir,
+        token=settings.profiling_token,
+        sample_rate=settings.profiling_sample_rate,
+        user_ids=settings.profiling_user_ids,
+        interval_ms=settings.profiling_interval_ms,
+    )
+
 app.include_router(tasks.router, prefix="/api/v1")
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+@app.get("/metrics")
+def metrics():
+    return {"coalesced_requests": read_coalescer.coalesced}
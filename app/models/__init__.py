@@ -1,5 +1,5 @@
 # Models module
 
-from app.models.task import Task
+from app.models.task import Task, TaskArchive
 
-__all__ = ["Task"]
+__all__ = ["Task", "TaskArchive"]
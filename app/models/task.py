@@ -2,17 +2,31 @@
 
 import uuid
 from datetime import datetime
+from sqlalchemy import Index, String, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import SQLModel, Field
 
+# Position keys must compare byte-wise, independent of the database locale
+_POSITION_TYPE = String(255).with_variant(String(255, collation="C"), "postgresql")
 
-class Task(SQLModel, table=True):
-    """A todo task belonging to a user.
+# Maximum length of a single tag
+TAG_MAX_LENGTH = 50
+
+
+class TaskBase(SQLModel):
+    """Columns shared by live and archived tasks.
 
     Attributes:
         id: Unique task identifier (UUID)
         user_id: Owner's user ID (from JWT sub claim), indexed for query performance
         title: Task description (1-255 characters)
         is_completed: Whether the task is done
+        position: Fractional ordering key within the user's list (see
+            app.services.positions); NULL for rows not yet ranked
+        due_at: When the task is due (UTC), optional
+        remind_at: When the next reminder should fire (UTC); cleared once
+            the reminder has been delivered
+        tags: User-defined labels, stored inline so they load with the task
         created_at: When the task was created
         updated_at: When the task was last modified
     """
@@ -21,5 +35,55 @@ class Task(SQLModel, table=True):
     user_id: str = Field(index=True)
     title: str = Field(max_length=255)
     is_completed: bool = Field(default=False)
+    position: str | None = Field(default=None, sa_type=_POSITION_TYPE)
+    due_at: datetime | None = Field(default=None)
+    remind_at: datetime | None = Field(default=None)
+    tags: list[str] = Field(
+        default_factory=list,
+        sa_type=ARRAY(String(TAG_MAX_LENGTH)),
+        sa_column_kwargs={"server_default": text("'{}'")},
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class Task(TaskBase, table=True):
+    """A todo task belonging to a user.
+
+    The ORM identity is (id, user_id) so that UPDATE and DELETE statements
+    emitted on flush always filter on user_id, which lets Postgres prune
+    them to a single partition when the table is hash partitioned.
+
+    The partial index on completed tasks lets the archive sweeper find
+    candidates without scanning open tasks; the partial index on remind_at
+    lets the reminder scheduler load just the next window of reminders. The
+    GIN index on tags serves tag containment filters.
+    """
+
+    __mapper_args__ = {"primary_key": ["id", "user_id"]}
+    __table_args__ = (
+        Index("ix_task_user_id_position", "user_id", "position"),
+        Index(
+            "ix_task_completed_updated_at",
+            "updated_at",
+            postgresql_where=text("is_completed"),
+        ),
+        Index(
+            "ix_task_remind_at_pending",
+            "remind_at",
+            postgresql_where=text("NOT is_completed"),
+        ),
+        Index("ix_task_tags", "tags", postgresql_using="gin"),
+    )
+
+
+class TaskArchive(TaskBase, table=True):
+    """A completed task moved out of the hot task table.
+
+    Attributes:
+        archived_at: When the archive sweeper moved the task
+    """
+
+    __tablename__ = "task_archive"
+
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
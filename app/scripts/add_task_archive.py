@@ -0,0 +1,18 @@
+# scripts/add_task_archive.py
+"""Create the task_archive table and the sweeper's index on an existing database.
+
+Usage:
+    python -m app.scripts.add_task_archive
+"""
+
+from app.core.database import engine
+from app.models.task import TaskArchive
+
+TaskArchive.__table__.create(engine, checkfirst=True)
+with engine.begin() as conn:
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_task_completed_updated_at "
+        "ON task (updated_at) WHERE is_completed"
+    )
+
+print("Task archive initialized")
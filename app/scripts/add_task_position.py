@@ -0,0 +1,29 @@
+# scripts/add_task_position.py
+"""Add the task.position column to an existing database and backfill it.
+
+Existing tasks are ranked per user by creation time. Usage:
+    python -m app.scripts.add_task_position
+"""
+
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.task import Task
+from app.services.task_service import TaskService
+
+with engine.begin() as conn:
+    conn.exec_driver_sql(
+        'ALTER TABLE task ADD COLUMN IF NOT EXISTS position VARCHAR(255) COLLATE "C"'
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_task_user_id_position ON task (user_id, position)"
+    )
+
+with Session(engine) as session:
+    user_ids = session.exec(
+        select(Task.user_id).where(Task.position.is_(None)).distinct()
+    ).all()
+    for user_id in user_ids:
+        TaskService(session, user_id).rebalance_positions()
+
+print(f"Task positions backfilled for {len(user_ids)} users")
@@ -0,0 +1,23 @@
+# scripts/add_task_reminders.py
+"""Add due_at/remind_at columns and the pending-reminder index to an existing database.
+
+Usage:
+    python -m app.scripts.add_task_reminders
+"""
+
+from app.core.database import engine
+
+with engine.begin() as conn:
+    for table in ("task", "task_archive"):
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS due_at TIMESTAMP WITHOUT TIME ZONE"
+        )
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS remind_at TIMESTAMP WITHOUT TIME ZONE"
+        )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_task_remind_at_pending "
+        "ON task (remind_at) WHERE NOT is_completed"
+    )
+
+print("Task reminder columns initialized")
@@ -0,0 +1,17 @@
+# scripts/add_task_tags.py
+"""Add the tags column and its GIN index to an existing database.
+
+Usage:
+    python -m app.scripts.add_task_tags
+"""
+
+from app.core.database import engine
+
+with engine.begin() as conn:
+    for table in ("task", "task_archive"):
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS tags VARCHAR(50)[] NOT NULL DEFAULT '{{}}'"
+        )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_task_tags ON task USING gin (tags)")
+
+print("Task tags initialized")
@@ -0,0 +1,59 @@
+# scripts/bench_write_pipeline.py
+"""Benchmark task writes/sec with and without the group-commit pipeline.
+
+Runs against DATABASE_URL. Usage:
+    python -m app.scripts.bench_write_pipeline [ops_per_worker]
+"""
+
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel import Session, delete
+
+from app.core.database import create_db_and_tables, engine
+from app.models.task import Task
+from app.services.task_service import TaskService
+from app.services.write_pipeline import WritePipeline
+
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+
+
+def run(concurrency: int, ops_per_worker: int, pipeline: WritePipeline | None) -> float:
+    user_id = f"bench-{uuid.uuid4()}"
+
+    def worker(_: int) -> None:
+        with Session(engine) as session:
+            service = TaskService(session, user_id, pipeline=pipeline)
+            for i in range(ops_per_worker):
+                task = service.create_task(f"bench task {i}")
+                service.toggle_complete(task.id)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    with Session(engine) as session:
+        session.exec(delete(Task).where(Task.user_id == user_id))
+        session.commit()
+
+    return concurrency * ops_per_worker * 2 / elapsed
+
+
+def main() -> None:
+    ops_per_worker = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    create_db_and_tables()
+
+    pipeline = WritePipeline()
+    print(f"{'concurrency':>11}  {'direct w/s':>10}  {'pipeline w/s':>12}")
+    for concurrency in CONCURRENCY_LEVELS:
+        direct = run(concurrency, ops_per_worker, None)
+        batched = run(concurrency, ops_per_worker, pipeline)
+        print(f"{concurrency:>11}  {direct:>10.0f}  {batched:>12.0f}")
+    pipeline.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# scripts/partition_tasks.py
+"""Migrate the existing task table to hash partitioning on user_id.
+
+Runs in a single transaction against DATABASE_URL. Usage:
+    python -m app.scripts.partition_tasks [partitions] [--keep-old]
+"""
+
+import sys
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.partitioning import migrate_task_table
+
+args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+partitions = int(args[0]) if args else settings.task_partition_count
+if partitions < 1:
+    sys.exit("Pass a partition count or set TASK_PARTITION_COUNT")
+
+with engine.begin() as conn:
+    copied = migrate_task_table(conn, partitions, keep_old="--keep-old" in sys.argv)
+
+print(f"Task table partitioned into {partitions} partitions ({copied} rows copied)")
@@ -0,0 +1,60 @@
+# scripts/verify_task_partitioning.py
+"""Check that every TaskService query prunes to a single task partition.
+
+Exercises each TaskService operation for a throwaway user, records the SQL
+it emits, and inspects the EXPLAIN plan of each read/update/delete. Inserts
+are routed at execution time and are not checked.
+"""
+
+import sys
+import uuid
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.core.partitioning import StatementRecorder, is_task_table_partitioned, scanned_relations
+from app.models.task import TaskArchive
+from app.services.task_service import TaskService
+
+with engine.connect() as conn:
+    if not is_task_table_partitioned(conn):
+        sys.exit("task table is not partitioned")
+
+user_id = f"partition-check-{uuid.uuid4()}"
+with Session(engine) as session:
+    archived = TaskArchive(user_id=user_id, title="partition check (archived)", is_completed=True)
+    session.add(archived)
+    session.commit()
+    archived_id = archived.id
+
+with StatementRecorder(engine) as recorder, Session(engine) as session:
+    service = TaskService(session, user_id)
+    task = service.create_task("partition check", tags=["partition-check"])
+    other = service.create_task("partition check (second)")
+    service.list_tasks()
+    service.list_tasks(["partition-check"])
+    service.get_task(task.id)
+    service.update_task(task.id, "partition check (updated)")
+    service.move_task(other.id, before_id=task.id)
+    service.rebalance_positions()
+    service.toggle_complete(task.id)
+    service.list_archived_tasks()
+    restored = service.restore_task(archived_id)
+    service.delete_task(restored.id)
+    service.delete_task(other.id)
+    service.delete_task(task.id)
+
+failures = 0
+with engine.connect() as conn:
+    for statement, parameters in recorder.statements:
+        if statement.lstrip().upper().startswith("INSERT"):
+            continue
+        relations = scanned_relations(conn, statement, parameters)
+        status = "ok" if len(relations) <= 1 else "NOT PRUNED"
+        failures += status != "ok"
+        summary = " ".join(statement.split())[:80]
+        print(f"[{status}] {sorted(relations)} {summary}")
+
+if failures:
+    sys.exit(f"{failures} statement(s) scanned more than one partition")
+print("All TaskService queries prune to a single partition")
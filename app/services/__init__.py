@@ -1,5 +1,7 @@
 # Services module
 
+from app.services.archive_service import ArchiveSweeper
 from app.services.task_service import TaskService
+from app.services.write_pipeline import WritePipeline, get_write_pipeline
 
-__all__ = ["TaskService"]
+__all__ = ["ArchiveSweeper", "TaskService", "WritePipeline", "get_write_pipeline"]
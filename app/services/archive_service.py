@@ -0,0 +1,134 @@
+"""Background archival of completed tasks into the task_archive table.
+
+Completed tasks older than TASK_ARCHIVE_AFTER_DAYS (measured from their last
+update, i.e. when they were completed) are moved out of the hot task table so
+`list_tasks` and the task indexes only cover live work.
+
+Rows are moved in batches of at most TASK_ARCHIVE_BATCH_SIZE, each in its own
+transaction, so lock hold times and WAL bursts stay bounded. Candidates are
+claimed with `FOR UPDATE SKIP LOCKED`, so several workers can sweep at once
+without blocking each other or user writes.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.models.task import Task, TaskArchive
+
+logger = logging.getLogger(__name__)
+
+
+def archive_completed_tasks(session: Session, cutoff: datetime, batch_size: int) -> int:
+    """Move one batch of completed tasks last updated before `cutoff`.
+
+    Commits the batch before returning.
+
+    Args:
+        session: Database session
+        cutoff: Only tasks completed before this time are archived
+        batch_size: Maximum number of rows moved in this transaction
+
+    Returns:
+        Number of tasks archived
+    """
+    task = Task.__table__
+    rows = session.execute(
+        select(task)
+        .where(task.c.is_completed, task.c.updated_at < cutoff)
+        .order_by(task.c.updated_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).mappings().all()
+    if not rows:
+        session.rollback()
+        return 0
+
+    archived_at = datetime.utcnow()
+    session.execute(
+        insert(TaskArchive.__table__),
+        [{**row, "archived_at": archived_at} for row in rows],
+    )
+    session.execute(
+        delete(task).where(
+            tuple_(task.c.id, task.c.user_id).in_(
+                [(row["id"], row["user_id"]) for row in rows]
+            )
+        )
+    )
+    session.commit()
+    return len(rows)
+
+
+class ArchiveSweeper:
+    """Periodically archives completed tasks on a background thread."""
+
+    def __init__(
+        self,
+        db_engine: Engine = engine,
+        after_days: float = 30,
+        batch_size: int = 500,
+        interval_seconds: float = 300,
+    ):
+        """Initialize the sweeper.
+
+        Args:
+            db_engine: Engine used to open one session per batch
+            after_days: Age after completion at which tasks are archived
+            batch_size: Maximum rows moved per transaction
+            interval_seconds: Pause between sweeps
+        """
+        self._engine = db_engine
+        self._age = timedelta(days=after_days)
+        self._batch_size = batch_size
+        self._interval = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the background thread if it is not already running."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="task-archive-sweeper",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Stop the sweeper after its current batch."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def sweep(self) -> int:
+        """Archive every eligible task, one bounded batch at a time.
+
+        Returns:
+            Total number of tasks archived
+        """
+        cutoff = datetime.utcnow() - self._age
+        total = 0
+        while not self._stop.is_set():
+            with Session(self._engine) as session:
+                moved = archive_completed_tasks(session, cutoff, self._batch_size)
+            total += moved
+            if moved < self._batch_size:
+                break
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception:
+                # A failed sweep is retried on the next interval
+                logger.exception("Task archive sweep failed")
+            self._stop.wait(self._interval)
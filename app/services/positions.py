@@ -0,0 +1,166 @@
+"""Fractional (lexicographic) position keys for manual task ordering.
+
+A position is a string over base-62 digits that sorts in byte order (the
+column uses the "C" collation). Between any two keys another key can always
+be generated, so moving a task only rewrites that task's row.
+
+A key is an integer part followed by an optional fraction:
+- The integer part starts with a head character giving its length:
+  "a".."z" for 1..26 digits (non-negative), "Z".."A" for 1..26 digits
+  (negative). Appending or prepending increments/decrements this integer
+  with carry, so keys only grow logarithmically with the list length.
+- The fraction is only used when inserting between two keys with the same
+  integer part. It never ends with the zero digit, which is what guarantees
+  a key exists between any two.
+
+Repeated inserts into the same gap still make fractions grow;
+`rebalanced_keys` produces a fresh set of short keys for a whole list.
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_INDEX = {digit: i for i, digit in enumerate(DIGITS)}
+_ZERO = DIGITS[0]
+
+# The smallest integer part; nothing can be prepended before it
+_SMALLEST_INTEGER = "A" + _ZERO * 26
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """Return a fraction strictly between `a` and `b` (None is +infinity)."""
+    if b is not None:
+        # Keep the common prefix, treating a missing digit of `a` as zero
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else _ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = _INDEX[a[0]] if a else 0
+    digit_b = _INDEX[b[0]] if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    """Return the length (head included) of an integer part."""
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid position key head {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    """Split a key into its integer part and fraction, validating both."""
+    if not key:
+        raise ValueError("Position key is empty")
+    length = _integer_length(key[0])
+    integer, fraction = key[:length], key[length:]
+    if len(integer) != length or any(digit not in _INDEX for digit in key[1:]):
+        raise ValueError(f"Invalid position key {key!r}")
+    if integer == _SMALLEST_INTEGER or fraction.endswith(_ZERO):
+        raise ValueError(f"Invalid position key {key!r}")
+    return integer, fraction
+
+
+def _increment(integer: str) -> str | None:
+    """Return the next integer part, or None past the largest one."""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        if digits[i] != DIGITS[-1]:
+            digits[i] = DIGITS[_INDEX[digits[i]] + 1]
+            return head + "".join(digits)
+        digits[i] = _ZERO
+
+    # Carried out of every digit: move to the next length
+    if head == "Z":
+        return "a" + _ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(_ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> str | None:
+    """Return the previous integer part, or None before the smallest one."""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        if digits[i] != _ZERO:
+            digits[i] = DIGITS[_INDEX[digits[i]] - 1]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+
+    # Borrowed out of every digit: move to the next length
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """Generate a position key that sorts strictly between `a` and `b`.
+
+    Args:
+        a: Key of the preceding item, or None for the start of the list
+        b: Key of the following item, or None for the end of the list
+
+    Returns:
+        New position key
+
+    Raises:
+        ValueError: If a key is malformed or `a` does not sort before `b`
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} does not sort before {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + _ZERO
+        integer_b, fraction_b = _split(b)
+        if integer_b == _SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if fraction_b:
+            return integer_b
+        previous = _decrement(integer_b)
+        if previous is None:
+            raise ValueError("Cannot generate a key before the smallest key")
+        return previous
+
+    integer_a, fraction_a = _split(a)
+    if b is None:
+        following = _increment(integer_a)
+        if following is None:
+            return integer_a + _midpoint(fraction_a, None)
+        return following
+
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    following = _increment(integer_a)
+    if following is not None and following < b:
+        return following
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def rebalanced_keys(count: int) -> list[str]:
+    """Return `count` increasing keys of minimal length."""
+    keys = []
+    key = None
+    for _ in range(count):
+        key = key_between(key, None)
+        keys.append(key)
+    return keys
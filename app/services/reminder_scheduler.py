@@ -0,0 +1,266 @@
+"""In-process scheduler that fires task reminders.
+
+The scheduler never polls the whole table. Every refresh it loads only the
+reminders due within the next REMINDER_WINDOW_SECONDS (a range scan on the
+partial `ix_task_remind_at_pending` index) into a min-heap, then sleeps until
+the earliest one is due.
+
+Due reminders are claimed with `SELECT ... FOR UPDATE SKIP LOCKED` and their
+remind_at cleared in the same transaction before delivery. When several
+workers load the same window, only the one that claims a row delivers it, so
+a reminder is never delivered twice. A task whose reminder was moved or
+which was completed in the meantime no longer matches the claim and is
+skipped.
+
+Delivery is therefore at-most-once: if the delivery callable fails, or the
+process dies between the claim and the call, the reminder is lost. It is
+delivered by REMINDER_DELIVERY ("package.module:function", called with the
+Task) or, by default, written to stdout through the "app.reminders" logger.
+"""
+
+import heapq
+import importlib
+import logging
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+reminder_logger = logging.getLogger("app.reminders")
+
+
+def log_reminder(task: Task) -> None:
+    """Default delivery: record the reminder in the reminder log."""
+    reminder_logger.info(
+        "Reminder for task %s (user %s): %s", task.id, task.user_id, task.title
+    )
+
+
+def _configure_reminder_log() -> None:
+    """Send the reminder log to stdout unless logging is already configured."""
+    if reminder_logger.level == logging.NOTSET:
+        reminder_logger.setLevel(logging.INFO)
+    if not reminder_logger.hasHandlers():
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        reminder_logger.addHandler(handler)
+
+
+def load_delivery(path: str) -> Callable[[Task], None]:
+    """Import a delivery callable from "package.module:function".
+
+    A plain dotted path ("package.module.function") is accepted as well.
+
+    Raises:
+        ImportError: If the module cannot be imported
+        AttributeError: If the module has no such attribute
+        TypeError: If the attribute is not callable
+    """
+    module_name, sep, attribute = path.partition(":")
+    if not sep:
+        module_name, _, attribute = path.rpartition(".")
+    deliver = getattr(importlib.import_module(module_name), attribute)
+    if not callable(deliver):
+        raise TypeError(f"Reminder delivery {path!r} is not callable")
+    return deliver
+
+
+class ReminderScheduler:
+    """Loads the next window of reminders into a heap and fires them."""
+
+    def __init__(
+        self,
+        db_engine: Engine = engine,
+        deliver: Callable[[Task], None] = log_reminder,
+        window_seconds: float = 300,
+        refresh_seconds: float = 30,
+        batch_size: int = 1000,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            db_engine: Engine used for loading and claiming reminders
+            deliver: Called once per claimed reminder, after commit; a
+                failure is logged and the reminder is not retried
+            window_seconds: How far ahead reminders are loaded
+            refresh_seconds: How often the window is reloaded
+            batch_size: Maximum reminders loaded per refresh
+        """
+        self._engine = db_engine
+        self._deliver = deliver
+        self._window = timedelta(seconds=window_seconds)
+        self._refresh = refresh_seconds
+        self._batch_size = batch_size
+        self._heap: list[tuple[datetime, uuid.UUID, str]] = []
+        self._scheduled: set[tuple[datetime, uuid.UUID, str]] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the scheduler thread if it is not already running."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run,
+                name="task-reminder-scheduler",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Stop the scheduler thread."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self, task: Task) -> None:
+        """Schedule a task's reminder right away if it falls in the window.
+
+        Lets reminders created in this process fire on time without waiting
+        for the next refresh. Reminders set in other processes are picked up
+        by the refresh.
+        """
+        if task.remind_at is None or task.is_completed:
+            return
+        if task.remind_at <= datetime.utcnow() + self._window:
+            self._push(task.remind_at, task.id, task.user_id)
+            self._wake.set()
+
+    def load_window(self) -> int:
+        """Load reminders due within the window into the heap.
+
+        Returns:
+            Number of newly scheduled reminders
+        """
+        horizon = datetime.utcnow() + self._window
+        statement = (
+            select(Task.remind_at, Task.id, Task.user_id)
+            .where(Task.remind_at <= horizon, Task.is_completed == False)  # noqa: E712
+            .order_by(Task.remind_at)
+            .limit(self._batch_size)
+        )
+        with Session(self._engine) as session:
+            rows = session.exec(statement).all()
+        return sum(self._push(*row) for row in rows)
+
+    def fire_due(self) -> int:
+        """Claim and deliver every heap entry that is due.
+
+        Returns:
+            Number of reminders delivered by this process
+        """
+        now = datetime.utcnow()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                self._scheduled.discard(entry)
+                due.append(entry)
+        if not due:
+            return 0
+
+        claimed = self._claim([(task_id, user_id) for _, task_id, user_id in due], now)
+        for task in claimed:
+            try:
+                self._deliver(task)
+            except Exception:
+                logger.exception("Reminder delivery failed for task %s", task.id)
+        return len(claimed)
+
+    def _claim(self, keys: list[tuple[uuid.UUID, str]], now: datetime) -> list[Task]:
+        """Atomically take ownership of due reminders.
+
+        Rows locked by another worker are skipped; rows whose reminder was
+        cleared, moved later or whose task was completed do not match.
+        """
+        table = Task.__table__
+        with Session(self._engine) as session:
+            rows = session.execute(
+                select(table)
+                .where(
+                    tuple_(table.c.id, table.c.user_id).in_(keys),
+                    table.c.remind_at <= now,
+                    table.c.is_completed == False,  # noqa: E712
+                )
+                .with_for_update(skip_locked=True)
+            ).mappings().all()
+            if not rows:
+                session.rollback()
+                return []
+            session.execute(
+                update(table)
+                .where(
+                    tuple_(table.c.id, table.c.user_id).in_(
+                        [(row["id"], row["user_id"]) for row in rows]
+                    )
+                )
+                .values(remind_at=None)
+            )
+            session.commit()
+        return [Task(**row) for row in rows]
+
+    def _push(self, remind_at: datetime, task_id: uuid.UUID, user_id: str) -> bool:
+        entry = (remind_at, task_id, user_id)
+        with self._lock:
+            if entry in self._scheduled:
+                return False
+            self._scheduled.add(entry)
+            heapq.heappush(self._heap, entry)
+            return True
+
+    def _run(self) -> None:
+        next_refresh = 0.0
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                if time.monotonic() >= next_refresh:
+                    self.load_window()
+                    next_refresh = time.monotonic() + self._refresh
+                self.fire_due()
+            except Exception:
+                logger.exception("Reminder scheduler iteration failed")
+
+            timeout = next_refresh - time.monotonic()
+            with self._lock:
+                if self._heap:
+                    until_due = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                    timeout = min(timeout, until_due)
+            self._wake.wait(max(timeout, 0))
+
+
+_scheduler: ReminderScheduler | None = None
+
+
+def get_reminder_scheduler() -> ReminderScheduler | None:
+    """Return the shared reminder scheduler, or None if reminders are off."""
+    global _scheduler
+    if not settings.reminders_enabled:
+        return None
+    if _scheduler is None:
+        if settings.reminder_delivery:
+            deliver = load_delivery(settings.reminder_delivery)
+        else:
+            _configure_reminder_log()
+            deliver = log_reminder
+        _scheduler = ReminderScheduler(
+            deliver=deliver,
+            window_seconds=settings.reminder_window_seconds,
+            refresh_seconds=settings.reminder_refresh_seconds,
+            batch_size=settings.reminder_batch_size,
+        )
+    return _scheduler
@@ -3,9 +3,21 @@
 import uuid
 from datetime import datetime
 
-from sqlmodel import Session, select
+from sqlalchemy import text
+from sqlmodel import Session, func, select
 
-from app.models.task import Task
+from app.core.singleflight import write_generations
+from app.models.task import Task, TaskArchive
+from app.services.positions import key_between, rebalanced_keys
+from app.services.write_pipeline import WritePipeline
+
+# Fields besides the title that update_task accepts
+UPDATABLE_FIELDS = {"due_at", "remind_at", "tags"}
+
+
+def normalize_tags(tags: list[str] | None) -> list[str]:
+    """Strip and de-duplicate tags, keeping their first-seen order."""
+    return list(dict.fromkeys(tag.strip() for tag in tags or [] if tag.strip()))
 
 
 class TaskService:
@@ -14,23 +26,43 @@ class TaskService:
     All operations are scoped to a specific user to enforce isolation.
     """
 
-    def __init__(self, session: Session, user_id: str):
+    def __init__(
+        self,
+        session: Session,
+        user_id: str,
+        pipeline: WritePipeline | None = None,
+    ):
         """Initialize the service with a database session and user ID.
 
         Args:
             session: SQLModel database session
             user_id: Authenticated user's ID (from JWT sub claim)
+            pipeline: Optional group-commit pipeline for creates and toggles
         """
         self.session = session
         self.user_id = user_id
+        self.pipeline = pipeline
 
-    def list_tasks(self) -> list[Task]:
+    def list_tasks(self, tags: list[str] | None = None) -> list[Task]:
         """Get all tasks belonging to the authenticated user.
 
+        Tasks are returned in their manual order, served by the
+        (user_id, position) index. Unranked tasks come last, oldest first.
+
+        Args:
+            tags: Only return tasks carrying all of these tags
+
         Returns:
             List of Task objects owned by the user
         """
-        statement = select(Task).where(Task.user_id == self.user_id)
+        statement = (
+            select(Task)
+            .where(Task.user_id == self.user_id)
+            .order_by(Task.position.asc().nulls_last(), Task.created_at)
+        )
+        tags = normalize_tags(tags)
+        if tags:
+            statement = statement.where(Task.tags.contains(tags))
         return list(self.session.exec(statement).all())
 
     def get_task(self, task_id: uuid.UUID) -> Task | None:
@@ -48,43 +80,83 @@ class TaskService:
         )
         return self.session.exec(statement).first()
 
-    def create_task(self, title: str) -> Task:
+    def create_task(
+        self,
+        title: str,
+        due_at: datetime | None = None,
+        remind_at: datetime | None = None,
+        tags: list[str] | None = None,
+    ) -> Task:
         """Create a new task for the authenticated user.
 
         Args:
             title: Task description (1-255 characters)
+            due_at: Optional due date (naive UTC)
+            remind_at: Optional reminder time (naive UTC)
+            tags: Optional labels
 
         Returns:
             Newly created Task object
         """
+        tags = normalize_tags(tags)
+        if self.pipeline is not None:
+            task = self.pipeline.create_task(
+                self.user_id, title, due_at=due_at, remind_at=remind_at, tags=tags
+            )
+            write_generations.bump(self.user_id)
+            return task
+
+        self._lock_positions()
         task = Task(
             user_id=self.user_id,
             title=title,
             is_completed=False,
+            position=key_between(self._last_position(), None),
+            due_at=due_at,
+            remind_at=remind_at,
+            tags=tags,
         )
         self.session.add(task)
         self.session.commit()
+        write_generations.bump(self.user_id)
         self.session.refresh(task)
         return task
 
-    def update_task(self, task_id: uuid.UUID, title: str) -> Task | None:
-        """Update a task's title if it belongs to the user.
+    def update_task(
+        self,
+        task_id: uuid.UUID,
+        title: str | None = None,
+        **changes,
+    ) -> Task | None:
+        """Update a task if it belongs to the user.
 
         Args:
             task_id: UUID of the task to update
-            title: New task title
+            title: New task title, or None to keep the current one
+            **changes: Other fields to set (due_at, remind_at, tags); a
+                value of None clears the field
 
         Returns:
             Updated Task object if found and owned, None otherwise
         """
+        unknown = set(changes) - UPDATABLE_FIELDS
+        if unknown:
+            raise TypeError(f"Fields cannot be updated: {', '.join(sorted(unknown))}")
+
         task = self.get_task(task_id)
         if not task:
             return None
 
-        task.title = title
+        if title is not None:
+            task.title = title
+        if "tags" in changes:
+            changes["tags"] = normalize_tags(changes["tags"])
+        for name, value in changes.items():
+            setattr(task, name, value)
         task.updated_at = datetime.utcnow()
         self.session.add(task)
         self.session.commit()
+        write_generations.bump(self.user_id)
         self.session.refresh(task)
         return task
 
@@ -103,6 +175,7 @@ class TaskService:
 
         self.session.delete(task)
         self.session.commit()
+        write_generations.bump(self.user_id)
         return True
 
     def toggle_complete(self, task_id: uuid.UUID) -> Task | None:
@@ -114,6 +187,12 @@ class TaskService:
         Returns:
             Updated Task object if found and owned, None otherwise
         """
+        if self.pipeline is not None:
+            task = self.pipeline.toggle_complete(self.user_id, task_id)
+            if task is not None:
+                write_generations.bump(self.user_id)
+            return task
+
         task = self.get_task(task_id)
         if not task:
             return None
@@ -122,5 +201,174 @@ class TaskService:
         task.updated_at = datetime.utcnow()
         self.session.add(task)
         self.session.commit()
+        write_generations.bump(self.user_id)
         self.session.refresh(task)
         return task
+
+    def move_task(
+        self,
+        task_id: uuid.UUID,
+        after_id: uuid.UUID | None = None,
+        before_id: uuid.UUID | None = None,
+    ) -> Task | None:
+        """Move a task between two neighbours in the user's manual order.
+
+        Only the moved task's row is updated: it receives a fractional
+        position key strictly between its new neighbours' keys.
+
+        Args:
+            task_id: UUID of the task to move
+            after_id: Task that should directly precede it (None = top)
+            before_id: Task that should directly follow it (None = bottom)
+
+        Returns:
+            Updated Task object if the task and neighbours are found and
+            owned, None otherwise
+
+        Raises:
+            ValueError: If the neighbours are still out of order after the
+                list was re-keyed (e.g. the client's view of the list is
+                stale)
+        """
+        # Read the task and its neighbours under the lock so a concurrent
+        # rebalance cannot change the key space underneath this move
+        self._lock_positions()
+        task = self.get_task(task_id)
+        if not task:
+            return None
+
+        neighbours = []
+        for neighbour_id in (after_id, before_id):
+            if neighbour_id is None:
+                neighbours.append(None)
+                continue
+            if neighbour_id == task_id:
+                raise ValueError("A task cannot be moved relative to itself")
+            neighbour = self.get_task(neighbour_id)
+            if not neighbour:
+                return None
+            neighbours.append(neighbour)
+        after, before = neighbours
+
+        rebalanced = False
+        if any(n is not None and n.position is None for n in neighbours):
+            # Legacy rows without a key: rank the whole list once
+            self.rebalance_positions()
+            self._lock_positions()
+            rebalanced = True
+
+        try:
+            position = self._position_between(after, before)
+        except ValueError:
+            if rebalanced:
+                raise
+            # Concurrent creates can give two tasks the same key; re-keying
+            # the list (ties keep creation order) separates them
+            self.rebalance_positions()
+            # The rebalance committed and released the lock; the expired
+            # neighbours are reloaded under the new one
+            self._lock_positions()
+            position = self._position_between(after, before)
+
+        task.position = position
+        task.updated_at = datetime.utcnow()
+        self.session.add(task)
+        self.session.commit()
+        write_generations.bump(self.user_id)
+        self.session.refresh(task)
+        return task
+
+    def rebalance_positions(self) -> int:
+        """Reassign the shortest possible position keys to all user tasks.
+
+        Keeps the current order. Used occasionally in the background when
+        repeated moves into the same gap have made keys long.
+
+        Returns:
+            Number of tasks re-keyed
+        """
+        self._lock_positions()
+        tasks = self.list_tasks()
+        for task, key in zip(tasks, rebalanced_keys(len(tasks))):
+            task.position = key
+            self.session.add(task)
+        self.session.commit()
+        write_generations.bump(self.user_id)
+        return len(tasks)
+
+    def list_archived_tasks(self) -> list[TaskArchive]:
+        """Get the user's archived tasks, most recently archived first.
+
+        Returns:
+            List of TaskArchive objects owned by the user
+        """
+        statement = (
+            select(TaskArchive)
+            .where(TaskArchive.user_id == self.user_id)
+            .order_by(TaskArchive.archived_at.desc())
+        )
+        return list(self.session.exec(statement).all())
+
+    def restore_task(self, task_id: uuid.UUID) -> Task | None:
+        """Move an archived task back into the live task list.
+
+        The restored task is appended to the end of the user's list and its
+        updated_at is reset so the sweeper does not archive it again right
+        away.
+
+        Args:
+            task_id: UUID of the archived task to restore
+
+        Returns:
+            Restored Task object if found and owned, None otherwise
+        """
+        # Lock the archived row: a concurrent restore of the same task waits,
+        # then finds it gone and reports not found
+        statement = select(TaskArchive).where(
+            TaskArchive.id == task_id,
+            TaskArchive.user_id == self.user_id
+        ).with_for_update()
+        archived = self.session.exec(statement).first()
+        if not archived:
+            return None
+
+        task = Task(**archived.model_dump(exclude={"archived_at"}))
+        self._lock_positions()
+        task.position = key_between(self._last_position(), None)
+        task.updated_at = datetime.utcnow()
+        self.session.add(task)
+        self.session.delete(archived)
+        self.session.commit()
+        write_generations.bump(self.user_id)
+        self.session.refresh(task)
+        return task
+
+    def _lock_positions(self) -> None:
+        """Serialize this user's position writes until the transaction ends.
+
+        Moves, rebalances, creates and restores each read the keys they
+        build on under this lock, so none of them can work from a key space
+        another one is rewriting. Uses a transaction-scoped advisory lock on
+        Postgres; other databases are not locked.
+        """
+        connection = self.session.connection()
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:user_id))"),
+                {"user_id": self.user_id},
+            )
+
+    @staticmethod
+    def _position_between(after: Task | None, before: Task | None) -> str:
+        """Return a key between two neighbours (None = list boundary)."""
+        return key_between(
+            after.position if after else None,
+            before.position if before else None,
+        )
+
+    def _last_position(self) -> str | None:
+        """Return the highest position key in the user's list."""
+        statement = select(func.max(Task.position)).where(
+            Task.user_id == self.user_id
+        )
+        return self.session.exec(statement).first()
@@ -0,0 +1,322 @@
+"""Group-commit write pipeline for task creation and completion toggles.
+
+Under bursty load every request committing on its own pays a full round trip
+and WAL flush. The pipeline collects create/toggle operations that arrive
+within a short window, applies them in ONE transaction (one multi-row INSERT
+and one UPDATE ... RETURNING per round of toggles), and then resolves each
+caller's result separately.
+
+Durability is unchanged from the caller's point of view: a call only returns
+after the transaction containing its write has committed. If applying a
+batch fails, nothing was committed and its operations are retried one by one
+so a single bad write only fails its own caller. If the COMMIT itself fails,
+its outcome is unknown, so every caller in the batch gets the error and
+nothing is retried. New tasks get their id when they are queued, so even a
+repeated insert would hit the primary key rather than duplicate the task.
+
+Writes still queued when the pipeline stops, and writes submitted after it
+stopped, fail with RuntimeError. A caller that times out waiting cancels its
+write if it has not been picked up yet, and then fails with TimeoutError;
+once its batch is being applied it keeps waiting for the outcome, so a
+failed call never leaves a committed write behind.
+
+The pipeline is opt-in via WRITE_PIPELINE_ENABLED.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import func, insert, not_, select, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.task import Task
+from app.services.positions import key_between
+
+_STOP = object()
+
+
+@dataclass
+class _WriteOp:
+    """A single pending write and the future its caller is waiting on."""
+
+    kind: str
+    user_id: str
+    task: Task | None = None
+    task_id: uuid.UUID | None = None
+    future: Future = field(default_factory=Future)
+
+
+def _toggle_rounds(batch: list[_WriteOp]) -> list[list[tuple[int, _WriteOp]]]:
+    """Group a batch's toggles into rounds of distinct tasks.
+
+    Toggling the same task twice in one UPDATE would only flip it once, so
+    duplicates go into successive rounds, applied in order.
+
+    Returns:
+        Rounds of (batch index, operation) pairs
+    """
+    rounds: list[list[tuple[int, _WriteOp]]] = []
+    for i, op in enumerate(batch):
+        if op.kind != "toggle":
+            continue
+        key = (op.task_id, op.user_id)
+        for round_ in rounds:
+            if all((o.task_id, o.user_id) != key for _, o in round_):
+                round_.append((i, op))
+                break
+        else:
+            rounds.append([(i, op)])
+    return rounds
+
+
+class WritePipeline:
+    """Batches concurrent task writes into shared transactions.
+
+    A single background worker drains the queue: it takes the first pending
+    operation, waits up to `window_ms` for more (or until `max_batch` is
+    reached), then commits the whole batch. Writes arriving while a batch is
+    being committed form the next batch.
+    """
+
+    def __init__(
+        self,
+        db_engine: Engine = engine,
+        window_ms: float = 2.0,
+        max_batch: int = 128,
+        timeout: float | None = 30.0,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            db_engine: Engine used to open one session per batch
+            window_ms: How long to wait for more writes after the first one
+            max_batch: Upper bound on operations per transaction
+            timeout: How long a caller waits for its write to be picked up
+                before cancelling it
+        """
+        self._engine = db_engine
+        self._window = window_ms / 1000.0
+        self._max_batch = max_batch
+        self._timeout = timeout
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> None:
+        """Start the background worker if it is not already running."""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run,
+                name="task-write-pipeline",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Flush queued writes and stop the background worker.
+
+        Writes submitted afterwards fail with RuntimeError.
+        """
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+            self._thread = None
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    def create_task(self, user_id: str, title: str, **fields) -> Task:
+        """Create a task through the pipeline, blocking until committed.
+
+        Args:
+            user_id: Owner's user ID
+            title: Task description
+            **fields: Optional Task fields (e.g. due_at, remind_at)
+
+        Returns:
+            The committed Task object
+        """
+        # Built now so the id is fixed before any attempt to insert it
+        task = Task(user_id=user_id, title=title, is_completed=False, **fields)
+        return self._submit(_WriteOp(kind="create", user_id=user_id, task=task))
+
+    def toggle_complete(self, user_id: str, task_id: uuid.UUID) -> Task | None:
+        """Toggle a task's completion through the pipeline.
+
+        Args:
+            user_id: Owner's user ID
+            task_id: UUID of the task to toggle
+
+        Returns:
+            Updated Task object if found and owned, None otherwise
+        """
+        return self._submit(
+            _WriteOp(kind="toggle", user_id=user_id, task_id=task_id)
+        )
+
+    def _submit(self, op: _WriteOp):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write pipeline stopped")
+            self._start_locked()
+            self._queue.put(op)
+        try:
+            return op.future.result(self._timeout)
+        except FutureTimeoutError:
+            if op.future.cancel():
+                raise
+        # Already being applied: wait for the outcome like the direct path
+        return op.future.result()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            op = self._queue.get()
+            if op is _STOP:
+                break
+
+            batch = [op]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                batch.append(nxt)
+
+            # Drop writes whose callers timed out and cancelled them
+            batch = [op for op in batch if op.future.set_running_or_notify_cancel()]
+            if batch:
+                self._flush(batch)
+
+        # Nothing is queued behind _STOP once closed; fail anything left over
+        while True:
+            try:
+                op = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is not _STOP and op.future.set_running_or_notify_cancel():
+                op.future.set_exception(RuntimeError("Write pipeline stopped"))
+
+    def _flush(self, batch: list[_WriteOp]) -> None:
+        """Commit a batch and resolve every caller's future."""
+        with Session(self._engine, expire_on_commit=False) as session:
+            try:
+                results = self._apply(session, batch)
+            except Exception as exc:
+                apply_error = exc
+            else:
+                try:
+                    session.commit()
+                except Exception as exc:
+                    # The COMMIT may or may not have taken effect, so
+                    # retrying could apply writes twice
+                    for op in batch:
+                        op.future.set_exception(exc)
+                    return
+                for op, result in zip(batch, results):
+                    op.future.set_result(result)
+                return
+
+        if len(batch) == 1:
+            batch[0].future.set_exception(apply_error)
+            return
+        # Nothing was committed; isolate the failure so one bad write only
+        # fails its own caller
+        for op in batch:
+            self._flush([op])
+
+    def _apply(self, session: Session, batch: list[_WriteOp]) -> list:
+        """Execute a batch inside an open transaction.
+
+        Returns:
+            One result per operation, in batch order
+        """
+        results: list = [None] * len(batch)
+        table = Task.__table__
+
+        creates = [(i, op) for i, op in enumerate(batch) if op.kind == "create"]
+        if creates:
+            # Append each new task after the user's current last position
+            users = {op.user_id for _, op in creates}
+            last_positions = dict(
+                session.execute(
+                    select(table.c.user_id, func.max(table.c.position))
+                    .where(table.c.user_id.in_(users))
+                    .group_by(table.c.user_id)
+                ).all()
+            )
+            for i, op in creates:
+                position = key_between(last_positions.get(op.user_id), None)
+                last_positions[op.user_id] = position
+                op.task.position = position
+                results[i] = op.task
+            session.execute(insert(table), [op.task.model_dump() for _, op in creates])
+
+        for round_ in _toggle_rounds(batch):
+            statement = (
+                update(table)
+                .where(
+                    tuple_(table.c.id, table.c.user_id).in_(
+                        [(op.task_id, op.user_id) for _, op in round_]
+                    )
+                )
+                .values(
+                    is_completed=not_(table.c.is_completed),
+                    updated_at=datetime.utcnow(),
+                )
+                .returning(*table.c)
+            )
+            updated = {
+                (row.id, row.user_id): Task(**row._mapping)
+                for row in session.execute(statement)
+            }
+            for i, op in round_:
+                results[i] = updated.get((op.task_id, op.user_id))
+
+        return results
+
+
+_pipeline: WritePipeline | None = None
+_pipeline_lock = threading.Lock()
+
+
+def get_write_pipeline() -> WritePipeline | None:
+    """Return the shared write pipeline, or None if it is disabled."""
+    global _pipeline
+    if not settings.write_pipeline_enabled:
+        return None
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = WritePipeline(
+                    window_ms=settings.write_pipeline_window_ms,
+                    max_batch=settings.write_pipeline_max_batch,
+                )
+    return _pipeline
+
+
+def shutdown_write_pipeline() -> None:
+    """Flush and stop the shared write pipeline if it was started."""
+    if _pipeline is not None:
+        _pipeline.stop()
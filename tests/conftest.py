@@ -0,0 +1,7 @@
+"""Test configuration: settings are read from the environment at import time."""
+
+import os
+
+os.environ.setdefault("BETTER_AUTH_SECRET", "test-secret")
+os.environ.setdefault("BETTER_AUTH_BASE_URL", "http://localhost:3000")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,88 @@
+"""Tests for fractional position keys."""
+
+import random
+
+import pytest
+
+from app.services.positions import key_between, rebalanced_keys
+
+
+def test_first_key():
+    assert key_between(None, None) == "a0"
+
+
+def test_appends_grow_logarithmically():
+    keys = [None]
+    for _ in range(100_000):
+        keys.append(key_between(keys[-1], None))
+    keys = keys[1:]
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert max(len(key) for key in keys) <= 4
+
+
+def test_prepends_grow_logarithmically():
+    keys = [None]
+    for _ in range(100_000):
+        keys.append(key_between(None, keys[-1]))
+    keys = keys[1:][::-1]
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert max(len(key) for key in keys) <= 4
+
+
+def test_same_gap_inserts_stay_ordered():
+    low, high = key_between(None, None), None
+    high = key_between(low, None)
+    # Always insert right after `low`
+    for _ in range(1_000):
+        middle = key_between(low, high)
+        assert low < middle < high
+        high = middle
+    # Always insert right before `high`
+    low = key_between(None, None)
+    high = key_between(low, None)
+    for _ in range(1_000):
+        middle = key_between(low, high)
+        assert low < middle < high
+        low = middle
+
+
+def test_random_inserts_stay_sorted():
+    rng = random.Random(0)
+    keys = [key_between(None, None)]
+    for _ in range(5_000):
+        i = rng.randint(0, len(keys))
+        before = keys[i - 1] if i > 0 else None
+        after = keys[i] if i < len(keys) else None
+        keys.insert(i, key_between(before, after))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_keys_between_integer_parts():
+    assert "a0" < key_between("a0", "a1") < "a1"
+    assert key_between("a0", "a2") == "a1"
+    assert "Zz" < key_between("Zz", "a0") < "a0"
+    assert key_between("az", None) == "b00"
+    assert key_between(None, "a0") == "Zz"
+
+
+@pytest.mark.parametrize("a, b", [("a1", "a1"), ("a2", "a1")])
+def test_out_of_order_neighbours_rejected(a, b):
+    with pytest.raises(ValueError):
+        key_between(a, b)
+
+
+@pytest.mark.parametrize("key", ["", "a", "a00", "!0", "a0/"])
+def test_malformed_keys_rejected(key):
+    with pytest.raises(ValueError):
+        key_between(key, None)
+
+
+def test_rebalanced_keys():
+    keys = rebalanced_keys(10_000)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 10_000
+    assert max(len(key) for key in keys) <= 4
+    assert rebalanced_keys(0) == []
@@ -0,0 +1,127 @@
+"""Tests for single-flight coalescing of concurrent reads."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from starlette.requests import Request
+
+from app.core.singleflight import SingleFlight, WriteGenerations, request_key, write_generations
+
+
+def make_request(path="/api/v1/tasks", query=b""):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query,
+        "headers": [],
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "root_path": "",
+    })
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def query():
+        calls.append(1)
+        release.wait(5)
+        return ["task"]
+
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(flight.do, "key", query) for _ in range(4)]
+        # Let every caller join before the leader finishes
+        while flight.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert calls == [1]
+    assert results == [["task"]] * 4
+    assert flight.coalesced == 3
+
+
+def test_finished_call_is_not_cached():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.coalesced == 0
+
+
+def test_error_is_shared_and_cleared():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_async_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def query():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "tasks"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", query) for _ in range(3)))
+
+    assert asyncio.run(main()) == ["tasks"] * 3
+    assert calls == [1]
+    assert flight.coalesced == 2
+
+
+def test_async_caller_joins_sync_call():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def query():
+        release.wait(5)
+        return "tasks"
+
+    async def join():
+        return await flight.do_async("key", query_async)
+
+    async def query_async():
+        raise AssertionError("should have joined the sync call")
+
+    with ThreadPoolExecutor(1) as executor:
+        leader = executor.submit(flight.do, "key", query)
+        while not flight._calls:
+            time.sleep(0.001)
+
+        async def main():
+            task = asyncio.create_task(join())
+            await asyncio.sleep(0.01)
+            release.set()
+            return await task
+
+        assert asyncio.run(main()) == "tasks"
+        assert leader.result(5) == "tasks"
+
+
+def test_write_generation_bump():
+    generations = WriteGenerations(slots=8)
+    before = generations.get("alice")
+    generations.bump("alice")
+    assert generations.get("alice") == before + 1
+
+
+def test_request_key_changes_after_a_write():
+    request = make_request(query=b"tag=b&tag=a")
+    key = request_key(request, "alice")
+    assert request_key(make_request(query=b"tag=a&tag=b"), "alice") == key
+
+    write_generations.bump("alice")
+    assert request_key(request, "alice") != key
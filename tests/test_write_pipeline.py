@@ -0,0 +1,198 @@
+"""Tests for the group-commit write pipeline, without a database.
+
+`_apply` is overridden to record batches; the pipeline still opens (empty)
+sessions on an in-memory SQLite engine.
+"""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.models.task import Task
+from app.services.write_pipeline import _STOP, WritePipeline, _toggle_rounds, _WriteOp
+
+
+class RecordingPipeline(WritePipeline):
+    """Pipeline whose batches are recorded instead of written."""
+
+    def __init__(self, fail=None, hold=None, **kwargs):
+        self.test_engine = create_engine("sqlite://")
+        super().__init__(db_engine=self.test_engine, **kwargs)
+        self.batches: list[list[_WriteOp]] = []
+        self.fail = fail or (lambda batch: False)
+        self.hold = hold
+
+    def _apply(self, session, batch):
+        self.batches.append(list(batch))
+        if self.hold is not None:
+            self.hold.wait(5)
+        session.execute(text("SELECT 1"))
+        if self.fail(batch):
+            raise ValueError("bad write")
+        return [op.task if op.kind == "create" else op.task_id for op in batch]
+
+
+def toggle(task_id=None, user_id="user"):
+    return _WriteOp(kind="toggle", user_id=user_id, task_id=task_id or uuid.uuid4())
+
+
+def queue_and_run(pipeline, ops):
+    """Queue ops before the worker starts, so they are batched together."""
+    for op in ops:
+        pipeline._queue.put(op)
+    pipeline.start()
+    return [op.future.result(5) for op in ops]
+
+
+def test_queued_writes_share_one_batch():
+    pipeline = RecordingPipeline(window_ms=50)
+    ops = [toggle() for _ in range(5)]
+    try:
+        assert queue_and_run(pipeline, ops) == [op.task_id for op in ops]
+    finally:
+        pipeline.stop()
+    assert [len(batch) for batch in pipeline.batches] == [5]
+
+
+def test_batches_respect_max_batch():
+    pipeline = RecordingPipeline(window_ms=50, max_batch=2)
+    try:
+        queue_and_run(pipeline, [toggle() for _ in range(5)])
+    finally:
+        pipeline.stop()
+    assert [len(batch) for batch in pipeline.batches] == [2, 2, 1]
+
+
+def test_concurrent_callers_get_their_own_results():
+    pipeline = RecordingPipeline(window_ms=20)
+    task_ids = [uuid.uuid4() for _ in range(8)]
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda t: pipeline.toggle_complete("user", t), task_ids))
+    finally:
+        pipeline.stop()
+    assert results == task_ids
+
+
+def test_failed_batch_is_retried_one_by_one():
+    bad = uuid.uuid4()
+    pipeline = RecordingPipeline(
+        window_ms=50, fail=lambda batch: any(op.task_id == bad for op in batch)
+    )
+    ops = [toggle(), toggle(bad), toggle()]
+    for op in ops:
+        pipeline._queue.put(op)
+    pipeline.start()
+    try:
+        assert ops[0].future.result(5) == ops[0].task_id
+        assert ops[2].future.result(5) == ops[2].task_id
+        with pytest.raises(ValueError):
+            ops[1].future.result(5)
+    finally:
+        pipeline.stop()
+    assert [len(batch) for batch in pipeline.batches] == [3, 1, 1, 1]
+
+
+def test_retried_create_keeps_its_id():
+    attempts = []
+    pipeline = RecordingPipeline(window_ms=50, fail=lambda batch: len(batch) > 1)
+    original_apply = pipeline._apply
+
+    def apply(session, batch):
+        attempts.append([op.task.id for op in batch])
+        return original_apply(session, batch)
+
+    pipeline._apply = apply
+    ops = [
+        _WriteOp(kind="create", user_id="user", task=Task(user_id="user", title=title))
+        for title in ("first", "second")
+    ]
+    try:
+        tasks = queue_and_run(pipeline, ops)
+    finally:
+        pipeline.stop()
+    ids = [task.id for task in tasks]
+    # The failed batch and both retries used the ids fixed at queue time
+    assert attempts == [ids, ids[:1], ids[1:]]
+
+
+def test_failed_commit_is_not_retried():
+    pipeline = RecordingPipeline(window_ms=50)
+
+    def fail_commit(conn):
+        raise RuntimeError("connection lost during COMMIT")
+
+    event.listen(pipeline.test_engine, "commit", fail_commit)
+    ops = [toggle() for _ in range(3)]
+    for op in ops:
+        pipeline._queue.put(op)
+    pipeline.start()
+    try:
+        for op in ops:
+            with pytest.raises(RuntimeError, match="COMMIT"):
+                op.future.result(5)
+    finally:
+        pipeline.stop()
+    assert len(pipeline.batches) == 1
+
+
+def test_duplicate_toggles_are_split_into_rounds():
+    a, b = uuid.uuid4(), uuid.uuid4()
+    batch = [
+        toggle(a),
+        toggle(b),
+        toggle(a),
+        _WriteOp(kind="create", user_id="user"),
+        toggle(a),
+        toggle(a, user_id="other"),
+    ]
+    rounds = _toggle_rounds(batch)
+    assert [[i for i, _ in round_] for round_ in rounds] == [[0, 1, 5], [2], [4]]
+
+
+def test_submit_after_stop_fails():
+    pipeline = RecordingPipeline()
+    pipeline.start()
+    pipeline.stop()
+    with pytest.raises(RuntimeError, match="stopped"):
+        pipeline.toggle_complete("user", uuid.uuid4())
+    assert pipeline.batches == []
+
+
+def test_writes_left_behind_stop_fail():
+    hold = threading.Event()
+    pipeline = RecordingPipeline(window_ms=0, hold=hold)
+    first = toggle()
+    pipeline._queue.put(first)
+    pipeline.start()
+    # The worker is busy with `first`; anything after _STOP is never applied
+    leftover = toggle()
+    pipeline._queue.put(_STOP)
+    pipeline._queue.put(leftover)
+    hold.set()
+    pipeline._thread.join(5)
+
+    assert first.future.result(5) == first.task_id
+    with pytest.raises(RuntimeError, match="stopped"):
+        leftover.future.result(5)
+    assert [op for batch in pipeline.batches for op in batch] == [first]
+
+
+def test_timed_out_write_is_cancelled_before_it_runs():
+    hold = threading.Event()
+    pipeline = RecordingPipeline(window_ms=0, hold=hold, timeout=0.05)
+    blocking = toggle()
+    pipeline._queue.put(blocking)
+    pipeline.start()
+    try:
+        with pytest.raises(TimeoutError):
+            pipeline.toggle_complete("user", uuid.uuid4())
+        hold.set()
+        assert blocking.future.result(5) == blocking.task_id
+    finally:
+        pipeline.stop()
+    # The cancelled write was dropped instead of being applied late
+    assert [op for batch in pipeline.batches for op in batch] == [blocking]